@@ -4,7 +4,7 @@ Deploy: modal deploy -m slackbot.app
 """
 
 import os
-import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import modal
 
@@ -12,9 +12,13 @@ from slackbot.modal_app import app, data_vol, rag_vol, trackio_vol, TRACKIO_MOUN
 
 slack_secret = modal.Secret.from_name("slack-secret")
 
+# Mentions handled at once. hf: turns are handed off to the router's own ML
+# queue, so a busy sandbox never holds these threads
+DISPATCH_THREADS = 16
+
 slack_bot_image = (
     modal.Image.debian_slim(python_version="3.12")
-    .pip_install("slack-bolt", "fastapi")
+    .pip_install("slack-bolt", "fastapi", "xxhash", "orjson", "numpy")
 )
 
 # These imports register Modal functions/classes on `app` as a side effect.
@@ -79,15 +83,13 @@ class Bot:
 
 def _register_slack_handlers(slack_app, router):
     """Register Slack event handlers on the bolt app."""
+    # Threads start on first submit, so none are captured in the memory snapshot
+    executor = ThreadPoolExecutor(max_workers=DISPATCH_THREADS, thread_name_prefix="router")
 
-    # Dispatch in a thread so Slack gets 200 within its 3s timeout
+    # Dispatch to the pool so Slack gets 200 within its 3s timeout
     @slack_app.event("app_mention")
     def handle_mention(body, client, **_):
-        threading.Thread(
-            target=router.handle,
-            args=(body["event"], client),
-            daemon=True,
-        ).start()
+        executor.submit(router.handle, body["event"], client)
 
     # Slack sends message events for every channel msg — ignore to avoid 404 noise
     @slack_app.event("message")
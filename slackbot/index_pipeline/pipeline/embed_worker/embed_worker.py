@@ -1,15 +1,33 @@
 """GPU embedding worker — TEI sidecar, returns chunks to the pipeline."""
 
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
 import modal
 
 from slackbot.modal_app import app, rag_vol
 
 from .helpers.file_parser import FileParser
-from .tei_server import BATCH_SIZE, PORT, TeiServer
+from .tei_server import MAX_BATCH, MAX_SEQ_LEN, MODEL, PORT, TeiServer
 
 WORKERS_PER_GPU = 4
 CHUNK_SIZE = 1024
 CHUNK_OVERLAP = 128
+# Chunked document groups buffered ahead of the GPU
+PREFETCH = 4
+# Documents pooled across files per splitter call, amortizing its per-call setup
+SPLIT_DOCS = 1024
+# TEI requests in flight per container, shared by all concurrent inputs —
+# TEI's router merges concurrent requests into one GPU batch
+MAX_IN_FLIGHT = 8
+# Nodes accumulated per embed pass, in multiples of the tuned TEI batch size
+FLUSH_BATCHES = 8
+# PDF extraction processes per container. os.cpu_count() reports the host's
+# cores, not the container's share, so it is capped
+PDF_PROCESSES = 4
 
 # TEI base image + parsing/chunking libs
 embed_image = (
@@ -22,10 +40,21 @@ embed_image = (
         "llama-index-core",
         "llama-index-readers-file",
         "pypdf",
+        "pypdfium2",
         "python-docx",
         "httpx",
+        "orjson",
+        "xxhash",
+        "huggingface_hub",
     )
     .run_commands("python -c \"import nltk; nltk.download('punkt_tab'); nltk.download('stopwords')\"")
+    # Bake the model weights into the image so cold workers don't all pull from the shared volume.
+    # Only what TEI loads — safetensors weights, configs, tokenizer, pooling — not the ONNX/.bin duplicates
+    .env({"HUGGINGFACE_HUB_CACHE": "/models"})
+    .run_commands(
+        "python -c \"from huggingface_hub import snapshot_download; "
+        f"snapshot_download('{MODEL}', allow_patterns=['*.json', '*.safetensors', 'vocab.txt'], ignore_patterns=['onnx/*'])\""
+    )
 )
 
 hf_secret = modal.Secret.from_name("hf-secret")
@@ -38,9 +67,7 @@ hf_secret = modal.Secret.from_name("hf-secret")
     gpu="A10G",
     timeout=60 * 60,
     env={
-        "HF_HOME": "/data/hf-cache",
-        "HUGGINGFACE_HUB_CACHE": "/data/hf-cache",
-        "WORKER_VERSION": "24",
+        "WORKER_VERSION": "25",
     },
 )
 @modal.concurrent(max_inputs=WORKERS_PER_GPU)
@@ -51,40 +78,179 @@ class EmbedWorker:
         import httpx
         from llama_index.core.node_parser import TokenTextSplitter
 
+        from .helpers.pdf_reader import PdfPool
+
+        # Started before any worker threads exist; shared by all concurrent inputs
+        self._pdf_pool = PdfPool(max_workers=min(os.cpu_count() or 1, PDF_PROCESSES))
+
         self._tei = TeiServer()
         self._tei.start()
+        # Estimated tokens per TEI request, sized by the per-GPU batch autotune
+        batch_size = self._tei.tune_batch_size()
+        self._token_budget = batch_size * MAX_SEQ_LEN
+        self._flush_nodes = batch_size * FLUSH_BATCHES
         self._splitter = TokenTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
-        self._parser = FileParser()
+        self._parser = FileParser(self._pdf_pool)
         self._http = httpx.Client(timeout=120.0)
+        self._requests = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT)
 
     @modal.method()
-    def embed(self, work: dict, worker_id: int) -> tuple[list, int]:
-        """Parse files, chunk, embed via TEI. Returns (chunks, worker_id)."""
-        docs = self._parser.parse(work)
-        chunks = self._chunk_and_embed(docs)
+    def embed(self, work: dict, worker_id: int) -> tuple[dict, int]:
+        """Parse files, chunk, embed via TEI. Returns (chunks, worker_id).
+
+        chunks holds parallel ids/documents/metadatas lists plus one float16
+        embeddings array, a fraction of the pickled size of per-chunk float
+        lists on the way to the upsert worker.
+
+        Parsing and splitting run on a background thread so the CPU prepares
+        the next group of nodes while TEI embeds the current one. Small files
+        are pooled until FLUSH_BATCHES full TEI batches are pending.
+        """
+        import numpy as np
+
+        chunks = {"ids": [], "documents": [], "metadatas": []}
+        arrays = []
+        # IDs embedded so far in this call — a file's boilerplate can recur across flushes
+        seen: set[str] = set()
+        pending = []
+        for group in _prefetch(self._split(self._parser.parse(work)), PREFETCH):
+            pending.extend(group)
+            if len(pending) >= self._flush_nodes:
+                arrays.append(self._embed_nodes(pending, seen, chunks))
+                pending = []
+        arrays.append(self._embed_nodes(pending, seen, chunks))
+        arrays = [a for a in arrays if len(a)]
+        chunks["embeddings"] = np.concatenate(arrays) if arrays else np.empty((0, 0), dtype=np.float16)
         return chunks, worker_id
 
-    def _chunk_and_embed(self, docs: list) -> list:
-        """Split docs into chunks and embed via TEI."""
-        nodes = self._splitter.get_nodes_from_documents(docs)
-        if not nodes:
-            return []
-        texts = [n.get_content() for n in nodes]
-        embeddings = self._embed_texts(texts)
-        return [
-            (n.node_id, emb, text, n.metadata)
-            for n, emb, text in zip(nodes, embeddings, texts)
-        ]
-
-    def _embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Batch POST to TEI sidecar."""
-        embeddings: list[list[float]] = []
-        for i in range(0, len(texts), BATCH_SIZE):
-            batch = texts[i : i + BATCH_SIZE]
-            resp = self._http.post(
-                f"http://127.0.0.1:{PORT}/embed",
-                json={"inputs": batch},
-            )
-            resp.raise_for_status()
-            embeddings.extend(resp.json())
+    def _split(self, groups: Iterator[list]) -> Iterator[list]:
+        """Split parsed document groups into nodes, SPLIT_DOCS documents per call."""
+        buffer = []
+        for docs in groups:
+            buffer.extend(docs)
+            if len(buffer) >= SPLIT_DOCS:
+                yield self._splitter.get_nodes_from_documents(buffer)
+                buffer = []
+        if buffer:
+            yield self._splitter.get_nodes_from_documents(buffer)
+
+    def _embed_nodes(self, nodes: list, seen: set[str], chunks: dict):
+        """Embed nodes whose IDs aren't in seen via TEI; returns their embeddings.
+
+        Appends each embedded node's id/text/metadata to chunks, in the same
+        order as the returned rows.
+        """
+        # Repeated text within a file hashes to the same ID — embed it once
+        unique = {}
+        for n in nodes:
+            text = n.get_content()
+            chunk_id = _chunk_id(n.metadata, text)
+            if chunk_id not in seen:
+                seen.add(chunk_id)
+                unique[chunk_id] = (text, n.metadata)
+        chunks["ids"].extend(unique)
+        chunks["documents"].extend(text for text, _ in unique.values())
+        chunks["metadatas"].extend(metadata for _, metadata in unique.values())
+        return self._embed_texts([text for text, _ in unique.values()])
+
+    def _embed_texts(self, texts: list[str]):
+        """Batch POST to TEI sidecar; returns a float16 array, rows in the same order as texts.
+
+        Texts are sorted by length before batching so each batch pads to a
+        similar sequence length instead of the longest chunk in the input.
+        """
+        import numpy as np
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = list(_token_batches(order, texts, self._token_budget))
+        results = self._requests.map(self._post_embed, ([texts[j] for j in idx] for idx in batches))
+        embeddings = np.empty((0, 0), dtype=np.float16)
+        for idx, batch_embeddings in zip(batches, results):
+            rows = np.asarray(batch_embeddings, dtype=np.float16)
+            if not embeddings.size:
+                embeddings = np.empty((len(texts), rows.shape[1]), dtype=np.float16)
+            embeddings[idx] = rows
         return embeddings
+
+    def _post_embed(self, inputs: list[str]) -> list[list[float]]:
+        # orjson: responses are large float arrays, several times faster than stdlib json
+        import orjson
+
+        resp = self._http.post(
+            f"http://127.0.0.1:{PORT}/embed",
+            content=orjson.dumps({"inputs": inputs}),
+            headers={"content-type": "application/json"},
+        )
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def _chunk_id(metadata: dict, text: str) -> str:
+    """Content-addressed chunk ID, so re-indexing unchanged text is an idempotent upsert.
+
+    Scoped to the source file: a chunk carries one source in its metadata,
+    and pruning a changed or deleted file must not drop another file's copy.
+    """
+    import xxhash
+
+    key = "\0".join((metadata.get("source", ""), metadata.get("filename", ""), text))
+    return xxhash.xxh3_128_hexdigest(key.encode())
+
+
+def _token_batches(order: list[int], texts: list[str], budget: int) -> Iterator[list[int]]:
+    """Group text indices into requests of at most budget estimated tokens.
+
+    Tokens are estimated as len(text) // 4, capped at MAX_SEQ_LEN since TEI
+    truncates longer inputs. Short texts pack into larger requests, up to
+    TEI's MAX_BATCH client limit.
+    """
+    batch: list[int] = []
+    tokens = 0
+    for i in order:
+        est = min(len(texts[i]) // 4 + 1, MAX_SEQ_LEN)
+        if batch and (tokens + est > budget or len(batch) >= MAX_BATCH):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(i)
+        tokens += est
+    if batch:
+        yield batch
+
+
+def _prefetch(items: Iterator, depth: int) -> Iterator:
+    """Consume an iterator on a background thread, buffering up to depth items."""
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        """Block until item is buffered; False if the consumer stopped first."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while (item := buffer.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Unblock the producer if the consumer stops early
+        stop.set()
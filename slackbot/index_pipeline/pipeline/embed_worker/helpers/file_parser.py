@@ -1,39 +1,76 @@
 """Parse files and zip archives into LlamaIndex Documents."""
 
 import io
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Iterator
+
+# Zip entries parsed per yielded group
+ZIP_GROUP_SIZE = 64
+# Threads reading entries within a group
+ZIP_READ_THREADS = 16
 
 
 class FileParser:
+    """Reads files and zip entries into Documents.
+
+    PDF text extraction runs on pdf_pool (a PdfPool) when given — separate
+    processes, since the per-page Python loop holds the GIL. Zip reads stay
+    on threads.
+    """
+
+    def __init__(self, pdf_pool=None):
+        from .pdf_reader import PdfiumReader
+
+        self._pdf_pool = pdf_pool
+        # Shared by every SimpleDirectoryReader; it fills in a reader per new
+        # extension on first use, so each reader is built once per container
+        self._extractors = {".pdf": PdfiumReader(pdf_pool)}
 
-    def parse(self, work: dict) -> list:
-        """Parse a work unit into Documents ready for embedding."""
+    def parse(self, work: dict) -> Iterator[list]:
+        """Parse a work unit into groups of Documents ready for embedding.
+
+        Yields one group per file (or per ZIP_GROUP_SIZE zip entries) so the
+        caller can embed a group while the next one is being parsed.
+        """
         if work["type"] == "files":
-            return self._parse_files(work["paths"])
+            return self._parse_files(work["paths"], work["fingerprints"])
         elif work["type"] == "zip_entries":
-            return self._parse_zip(work["zip_path"], work["entries"])
+            return self._parse_zip(work["zip_path"], work["entries"], work["fingerprint"])
         raise ValueError(f"Unknown work type: {work['type']}")
 
-    def _parse_files(self, paths: list[str]) -> list:
+    def _parse_files(self, paths: list[str], fingerprints: dict[str, str]) -> Iterator[list]:
         """Parse loose files (PDF, DOCX, plaintext) via SimpleDirectoryReader.
 
-        Each doc gets source (filename) and fingerprint (mtime:size) metadata
-        so Scanner can detect changes on subsequent runs.
+        Each doc gets source (filename) and fingerprint (mtime:size:xxh3, from
+        Scanner) metadata so Scanner can detect changes on subsequent runs.
         """
         from llama_index.core import SimpleDirectoryReader
+        from llama_index.core.readers.file.base import default_file_metadata_func
+
+        by_name = {Path(path).name: fp for path, fp in fingerprints.items()}
+
+        def metadata(path: str) -> dict:
+            name = Path(path).name
+            return {**default_file_metadata_func(path), "source": name, "fingerprint": by_name[name]}
 
-        docs = []
+        # load_file() needs no reader instance, and fills in self._extractors as it goes
         for path in paths:
-            p = Path(path)
-            fingerprint = _fingerprint(p)
-            for doc in SimpleDirectoryReader(input_files=[path]).load_data():
-                doc.metadata["source"] = p.name
-                doc.metadata["fingerprint"] = fingerprint
-                docs.append(doc)
-        return docs
-
-    def _parse_zip(self, zip_path: str, entries: list[str]) -> list:
+            try:
+                docs = SimpleDirectoryReader.load_file(Path(path), metadata, self._extractors, raise_on_error=True)
+            except Exception as e:
+                # A crashed PDF pool is raised, as in _read_zip_entry; anything
+                # else skips the file, as SimpleDirectoryReader would
+                if isinstance(e.__cause__, BrokenProcessPool):
+                    raise e.__cause__
+                print(f"[parse] skipping {Path(path).name}: {e.__cause__ or e}", flush=True)
+                continue
+            yield docs
+
+    def _parse_zip(self, zip_path: str, entries: list[str], fingerprint: str) -> Iterator[list]:
         """Read assigned zip entries into Documents.
 
         Each entry is extracted as text (PDF pages joined, plaintext decoded).
@@ -42,32 +79,51 @@ class FileParser:
         from llama_index.core import Document
 
         p = Path(zip_path)
-        fingerprint = _fingerprint(p)
-        docs = []
-        with zipfile.ZipFile(zip_path) as zf:
-            for name in entries:
-                text = _read_zip_entry(zf, name)
-                if text and text.strip():
-                    docs.append(Document(
-                        text=text,
-                        metadata={"source": p.name, "filename": name, "fingerprint": fingerprint},
-                    ))
-        return docs
-
-
-def _fingerprint(path: Path) -> str:
-    """mtime_ns:size — stored in ChromaDB metadata for incremental indexing."""
-    stat = path.stat()
-    return f"{stat.st_mtime_ns}:{stat.st_size}"
-
-
-def _read_zip_entry(zf: zipfile.ZipFile, name: str) -> str | None:
-    """Extract text from a zip entry. PDFs via pypdf, everything else as UTF-8."""
+
+        # ZipFile handles aren't safe for concurrent reads — one per thread
+        local = threading.local()
+        handles: list[zipfile.ZipFile] = []
+
+        def read(name: str) -> str | None:
+            if not hasattr(local, "zf"):
+                local.zf = zipfile.ZipFile(zip_path)
+                handles.append(local.zf)
+            return _read_zip_entry(local.zf, name, self._pdf_pool)
+
+        try:
+            with ThreadPoolExecutor(max_workers=ZIP_READ_THREADS) as pool:
+                for i in range(0, len(entries), ZIP_GROUP_SIZE):
+                    names = entries[i : i + ZIP_GROUP_SIZE]
+                    yield [
+                        Document(
+                            text=text,
+                            metadata={"source": p.name, "filename": name, "fingerprint": fingerprint},
+                        )
+                        for name, text in zip(names, pool.map(read, names))
+                        if text and text.strip()
+                    ]
+        finally:
+            for zf in handles:
+                zf.close()
+
+
+def _read_zip_entry(zf: zipfile.ZipFile, name: str, pdf_pool=None) -> str | None:
+    """Extract text from a zip entry. PDFs via PDFium, everything else as UTF-8.
+
+    Unreadable entries are skipped, but a PDF that crashes the extraction
+    pool is raised — skipping it would record the zip as indexed.
+    """
     try:
-        data = zf.read(name)
-        if name.lower().endswith(".pdf"):
-            from pypdf import PdfReader
-            return "\n".join(p.extract_text() or "" for p in PdfReader(io.BytesIO(data)).pages)
-        return data.decode("utf-8", errors="replace")
+        with zf.open(name) as fh:
+            if name.lower().endswith(".pdf"):
+                # PDF parsing needs random access, and seeking a deflate stream re-inflates it
+                from .pdf_reader import pdf_pages
+                data = fh.read()
+                pages = pdf_pool.pages(data) if pdf_pool else pdf_pages(data)
+                return "\n".join(pages)
+            # Decode while inflating rather than holding the raw bytes and the str at once
+            return io.TextIOWrapper(fh, encoding="utf-8", errors="replace").read()
+    except BrokenProcessPool:
+        raise
     except Exception:
         return None
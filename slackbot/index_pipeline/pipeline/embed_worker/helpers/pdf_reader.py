@@ -0,0 +1,109 @@
+"""PDF text extraction — PDFium (C++) first, pypdf as a fallback."""
+
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from llama_index.core import Document
+from llama_index.core.readers.base import BaseReader
+
+# PDFium is not thread-safe; serializes extraction within a process when
+# readers run inline on parser threads
+_PDFIUM_LOCK = threading.Lock()
+
+
+class PdfPool:
+    """Process pool for pdf_pages that replaces itself after a worker dies.
+
+    A segfault or OOM kill in one process breaks a ProcessPoolExecutor for
+    good, failing every later submit. The pool is rebuilt and the file
+    retried once; a second break is the file's own doing and is raised.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        # Forked while the caller is still single-threaded
+        self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        self._pool.submit(int).result()
+
+    def pages(self, data: bytes) -> list[str]:
+        pool = self._pool
+        try:
+            return pool.submit(pdf_pages, data).result()
+        except BrokenProcessPool:
+            self._replace(pool)
+            return self._pool.submit(pdf_pages, data).result()
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Concurrent callers all see the same break; only the first rebuilds
+            if self._pool is broken:
+                print("[pdf] extraction process died, restarting pool", flush=True)
+                broken.shutdown(wait=False, cancel_futures=True)
+                # Worker threads are running by now, so fork is no longer safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+
+
+class PdfiumReader(BaseReader):
+    """SimpleDirectoryReader extractor for .pdf files, one Document per page.
+
+    With a PdfPool, extraction runs there, off the GIL; otherwise inline.
+    """
+
+    def __init__(self, pool: PdfPool | None = None):
+        super().__init__()
+        self._pool = pool
+
+    def load_data(self, file: Path, extra_info: dict | None = None, fs=None) -> list[Document]:
+        data = fs.open(str(file), "rb").read() if fs is not None else Path(file).read_bytes()
+        pages = self._pool.pages(data) if self._pool else pdf_pages(data)
+        return [
+            Document(text=text, metadata={"page_label": str(i + 1), **(extra_info or {})})
+            for i, text in enumerate(pages)
+        ]
+
+
+def pdf_pages(data: bytes) -> list[str]:
+    """Extract text per page. Falls back to pypdf if PDFium can't open the file."""
+    try:
+        return _pdfium_pages(data)
+    except Exception:
+        return _pypdf_pages(data)
+
+
+def _pdfium_pages(data: bytes) -> list[str]:
+    import pypdfium2
+
+    with _PDFIUM_LOCK:
+        pdf = pypdfium2.PdfDocument(data)
+        try:
+            pages = [""] * len(pdf)
+            for i in range(len(pages)):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                pages[i] = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
+
+def _pypdf_pages(data: bytes) -> list[str]:
+    """Skips pages that fail to extract instead of dropping the file."""
+    from pypdf import PdfReader
+
+    pages = []
+    for page in PdfReader(io.BytesIO(data), strict=False).pages:
+        try:
+            pages.append(page.extract_text() or "")
+        except Exception:
+            continue
+    return pages
@@ -1,5 +1,5 @@
 """TEI embedding server subprocess."""
 
-from .server import BATCH_SIZE, MODEL, PORT, TeiServer
+from .server import BATCH_SIZE, MAX_BATCH, MAX_SEQ_LEN, MODEL, PORT, TeiServer
 
-__all__ = ["BATCH_SIZE", "MODEL", "PORT", "TeiServer"]
+__all__ = ["BATCH_SIZE", "MAX_BATCH", "MAX_SEQ_LEN", "MODEL", "PORT", "TeiServer"]
@@ -1,6 +1,7 @@
 """Splits files and zip entries into per-worker batches."""
 
-import math
+import heapq
+import os
 import zipfile
 
 
@@ -9,37 +10,55 @@ class BatchBuilder:
     def __init__(self, n_batches: int):
         self._n = n_batches
 
-    def build(self, files: list[str]) -> list[tuple[dict, int]]:
-        """Return (work_dict, worker_id) tuples ready for embed.starmap()."""
-        batches: list[dict] = []
+    def build(self, files: dict[str, str]) -> list[tuple[dict, int]]:
+        """Return (work_dict, worker_id) tuples ready for embed.starmap().
+
+        files maps each path to the fingerprint Scanner computed for it;
+        work units carry it through so workers don't re-stat or re-hash.
+        Batches are ordered heaviest first so the longest ones start earliest.
+        """
+        batches: list[tuple[int, dict]] = []
         batches.extend(self._split_files(files))
         batches.extend(self._split_zips(files))
-        return [(batch, i) for i, batch in enumerate(batches)]
+        batches.sort(key=lambda b: b[0], reverse=True)
+        return [(batch, i) for i, (_, batch) in enumerate(batches)]
 
-    def _split_files(self, files: list[str]) -> list[dict]:
-        """Distribute regular files evenly across workers."""
-        regular = [f for f in files if not f.endswith(".zip")]
-        return [{"type": "files", "paths": chunk} for chunk in self._chunk(regular)]
+    def _split_files(self, files: dict[str, str]) -> list[tuple[int, dict]]:
+        """Distribute regular files across workers, balanced by size."""
+        sizes = {f: os.path.getsize(f) for f in files if not f.endswith(".zip")}
+        return [
+            (load, {"type": "files", "paths": group, "fingerprints": {p: files[p] for p in group}})
+            for load, group in self._balance(sizes)
+        ]
 
-    def _split_zips(self, files: list[str]) -> list[dict]:
-        """Expand each zip and distribute its entries across workers."""
+    def _split_zips(self, files: dict[str, str]) -> list[tuple[int, dict]]:
+        """Expand each zip and distribute its entries across workers, balanced by size."""
         batches = []
-        for path in files:
+        for path, fingerprint in files.items():
             if not path.endswith(".zip"):
                 continue
             with zipfile.ZipFile(path) as zf:
-                entries = [n for n in zf.namelist() if not n.endswith("/")]
-            for chunk in self._chunk(entries):
-                batches.append({"type": "zip_entries", "zip_path": path, "entries": chunk})
+                sizes = {i.filename: i.file_size for i in zf.infolist() if not i.is_dir()}
+            for load, group in self._balance(sizes):
+                batches.append((load, {
+                    "type": "zip_entries",
+                    "zip_path": path,
+                    "entries": group,
+                    "fingerprint": fingerprint,
+                }))
         return batches
 
-    def _chunk(self, items: list) -> list[list]:
-        """Split items into roughly equal groups (up to self._n).
+    def _balance(self, sizes: dict[str, int]) -> list[tuple[int, list[str]]]:
+        """Split items into up to self._n groups of roughly equal total size.
 
-        Each chunk is ceil(len(items) / n_batches) items. With 8 GPUs × 4
-        workers per GPU = 32 batches, 100 files produces 32 chunks of ~4 each.
+        Longest-processing-time first: items are placed largest first, each
+        into the group with the smallest total so far. One huge file gets a
+        worker to itself instead of dragging a whole even-count chunk with it.
+        Returns (total_size, items) per non-empty group.
         """
-        if not items:
-            return []
-        size = math.ceil(len(items) / self._n)
-        return [items[i : i + size] for i in range(0, len(items), size)]
+        groups = [(0, i, []) for i in range(min(self._n, len(sizes)))]
+        for item in sorted(sizes, key=sizes.get, reverse=True):
+            load, i, group = heapq.heappop(groups)
+            group.append(item)
+            heapq.heappush(groups, (load + sizes[item], i, group))
+        return [(load, group) for load, _, group in groups]
@@ -1,10 +1,14 @@
 """Document scanner — finds new/changed files via ChromaDB comparison."""
 
+import os
 from pathlib import Path
 from typing import Callable
 
 from slackbot.modal_app import rag_vol
 
+# Read size for content hashing
+HASH_BLOCK = 1 << 20
+
 
 class Scanner:
 
@@ -12,27 +16,83 @@ class Scanner:
         self._docs_dir = docs_dir
         self._get_indexed = get_indexed
 
-    def scan(self) -> list[str]:
-        """Compare disk fingerprints against ChromaDB, return new/changed files."""
+    def scan(self) -> tuple[dict[str, str], list[str], dict[str, str | None]]:
+        """Compare disk fingerprints against ChromaDB.
+
+        Returns ({path: fingerprint} for new/changed files, names of indexed
+        files that changed or are no longer on disk, {name: fingerprint}
+        manifest updates for the run). The middle list is what may have stale
+        chunks to prune. The updates hold the new fingerprint of every file
+        that differs from the manifest — embedded or not, so a version that
+        yields no chunks still supersedes the old one — and None for a
+        removed file.
+
+        Fingerprints are mtime_ns:size:xxh3. A matching mtime and size is
+        trusted without reading the file; otherwise the content hash decides,
+        so a touch/rsync/checkout that leaves the bytes alone isn't re-embedded.
+        """
         rag_vol.reload()
         if not self._docs_dir.exists():
-            return []
+            return {}, [], {}
 
         # {filename: fingerprint} for files already in ChromaDB
         indexed = self._get_indexed()
 
-        # Compare each file's current fingerprint against what's indexed
-        all_files = sorted(p for p in self._docs_dir.iterdir() if p.is_file())
-        new_or_changed = [p for p in all_files if indexed.get(p.name) != self._fingerprint(p)]
+        # Compare each file's current fingerprint against what's indexed.
+        # scandir's DirEntry caches the file type and stat — one syscall per file.
+        with os.scandir(self._docs_dir) as it:
+            all_files = sorted((e for e in it if e.is_file()), key=lambda e: e.name)
+        new_or_changed = {}
+        changed = []
+        updates: dict[str, str | None] = {}
+        for e in all_files:
+            old = indexed.get(e.name)
+            fingerprint = self._fingerprint(e, old)
+            if fingerprint == old:
+                continue
+            updates[e.name] = fingerprint
+            # Same size and bytes under a new mtime — only the manifest is
+            # updated, so later scans trust the mtime again without re-hashing
+            if old is not None and _content(fingerprint) == _content(old):
+                continue
+            new_or_changed[e.path] = fingerprint
+            if old is not None:
+                changed.append(e.name)
+
+        on_disk = {e.name for e in all_files}
+        removed = sorted(name for name in indexed if name not in on_disk)
+        updates.update(dict.fromkeys(removed))
+
+        self._log(list(new_or_changed), len(all_files), removed)
+        return new_or_changed, changed + removed, updates
+
+    def _fingerprint(self, entry: os.DirEntry, indexed: str | None) -> str:
+        """Return the file's current fingerprint, reusing indexed if mtime and size match."""
+        stat = entry.stat()
+        quick = f"{stat.st_mtime_ns}:{stat.st_size}"
+        if indexed is not None and indexed.startswith(quick + ":"):
+            return indexed
+        return f"{quick}:{_content_hash(entry.path)}"
+
+    def _log(self, to_index: list[str], total: int, removed: list[str]) -> None:
+        print(
+            f"[scan] {len(to_index)} to index, {total - len(to_index)} already indexed, {len(removed)} removed",
+            flush=True,
+        )
+        for path in to_index:
+            print(f"[scan]   {Path(path).name}", flush=True)
+
+
+def _content(fingerprint: str) -> str:
+    """The size:xxh3 part of a fingerprint."""
+    return fingerprint.split(":", 1)[1]
 
-        self._log(new_or_changed, len(all_files))
-        return [str(p) for p in new_or_changed]
 
-    def _fingerprint(self, path: Path) -> str:
-        stat = path.stat()
-        return f"{stat.st_mtime_ns}:{stat.st_size}"
+def _content_hash(path: str) -> str:
+    import xxhash
 
-    def _log(self, to_index: list[Path], total: int) -> None:
-        print(f"[scan] {len(to_index)} to index, {total - len(to_index)} already indexed", flush=True)
-        for p in to_index:
-            print(f"[scan]   {p.name}", flush=True)
+    h = xxhash.xxh3_64()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK):
+            h.update(block)
+    return h.hexdigest()
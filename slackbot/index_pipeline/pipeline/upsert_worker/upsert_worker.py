@@ -1,19 +1,32 @@
 """CPU upsert worker — writes embedded chunks to ChromaDB."""
 
+import os
 from pathlib import Path
 import modal
 from slackbot.modal_app import app, rag_vol
 
 CHROMA_DIR = "/data/rag/chroma"
 CHROMA_COLLECTION = "rag_documents"
+# Append-only {source: fingerprint} log, one JSON object per line; later lines win,
+# and a null fingerprint marks a source removed from disk
+MANIFEST_PATH = Path(CHROMA_DIR) / "manifest.ndjson"
+# Rows per Chroma call, capped at the client's max batch size. With numpy
+# embeddings the per-call overhead dominates, so bigger is faster
 UPSERT_BATCH = 5_000
+# Commit the volume every N upsert calls for crash recovery; the rest is coalesced into finish()
+COMMIT_EVERY = 25
 
-upsert_image = modal.Image.debian_slim(python_version="3.12").pip_install("chromadb")
+upsert_image = modal.Image.debian_slim(python_version="3.12").pip_install("chromadb", "orjson")
 
+# One container owns chroma.sqlite3 and the manifest handle for a whole run —
+# a second writer on the volume would lose one side's changes. The idle
+# window covers the gaps between embed results so it isn't recycled mid-run
 @app.cls(
     image=upsert_image,
     volumes={"/data": rag_vol},
     timeout=60 * 60,
+    max_containers=1,
+    scaledown_window=20 * 60,
 )
 @modal.concurrent(max_inputs=1)
 class UpsertWorker:
@@ -21,30 +34,120 @@ class UpsertWorker:
     @modal.enter()
     def _setup(self):
         import chromadb
+        import orjson
+        from chromadb.config import Settings
 
-        # SQLite-backed persistent store on the rag volume
+        # SQLite-backed persistent store on the rag volume; telemetry off skips a startup HTTP call
         Path(CHROMA_DIR).mkdir(parents=True, exist_ok=True)
-        client = chromadb.PersistentClient(path=CHROMA_DIR)
+        client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False))
         # Opens existing collection or creates a new empty one
         self._collection = client.get_or_create_collection(CHROMA_COLLECTION)
+        self._batch_size = min(UPSERT_BATCH, client.get_max_batch_size())
+        self._uncommitted = 0
+
+        # Seed the manifest from chunk metadata for stores indexed before it existed
+        if not MANIFEST_PATH.exists():
+            tmp = MANIFEST_PATH.with_suffix(".tmp")
+            tmp.write_bytes(b"".join(
+                orjson.dumps({source: fp}) + b"\n" for source, fp in self._scan_collection().items()
+            ))
+            # Renamed into place so an interrupted seed never leaves a truncated manifest
+            os.replace(tmp, MANIFEST_PATH)
+        # Parsed once per container, then kept current as upserts append to it
+        self._indexed = self._load_manifest()
+        self._manifest = MANIFEST_PATH.open("ab", buffering=0)
+        self._manifest_stamp = _stamp(MANIFEST_PATH)
 
     @modal.method()
-    def upsert(self, chunks: list, worker_id: int) -> int:
-        """Write chunks to ChromaDB in batches of UPSERT_BATCH.
+    def upsert(self, chunks: dict, worker_id: int) -> int:
+        """Write chunks to ChromaDB in batches of up to UPSERT_BATCH.
 
-        Each chunk is (id, embedding, text, metadata) from EmbedWorker.
+        chunks is EmbedWorker's output: parallel ids/documents/metadatas
+        lists and a float16 embeddings array, widened to float32 per batch.
         """
-        print(f"  upsert-worker: upserting {len(chunks):,} chunks from worker-{worker_id}...", flush=True)
-        for i in range(0, len(chunks), UPSERT_BATCH):
-            batch = chunks[i : i + UPSERT_BATCH]
-            ids, embeddings, documents, metadatas = zip(*batch)
+        import numpy as np
+
+        ids = chunks["ids"]
+        print(f"  upsert-worker: upserting {len(ids):,} chunks from worker-{worker_id}...", flush=True)
+        if not ids:
+            return 0
+        embeddings, documents, metadatas = chunks["embeddings"], chunks["documents"], chunks["metadatas"]
+        for i in range(0, len(ids), self._batch_size):
+            end = i + self._batch_size
+            batch_embeddings = embeddings[i:end].astype(np.float32)
+            self._write_batch(ids[i:end], batch_embeddings, documents[i:end], metadatas[i:end])
+        self._record_sources(metadatas)
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_EVERY:
+            self._commit()
+        return len(ids)
+
+    def _write_batch(self, ids: list, embeddings, documents: list, metadatas: list) -> None:
+        """Upsert new chunk IDs; for IDs already stored, refresh metadata only.
+
+        Chunk IDs are content hashes, so an existing ID already holds the same
+        text and vector — rewriting it would only churn the HNSW graph.
+        embeddings is a float32 array; when every ID is new (the usual case)
+        the slices go to Chroma as-is, with no per-row work.
+        """
+        existing = set(self._collection.get(ids=ids, include=[])["ids"])
+        if not existing:
+            self._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+            return
+        self._collection.update(
+            ids=[id_ for id_ in ids if id_ in existing],
+            metadatas=[m for id_, m in zip(ids, metadatas) if id_ in existing],
+        )
+        new = [j for j, id_ in enumerate(ids) if id_ not in existing]
+        if new:
             self._collection.upsert(
-                ids=list(ids),
-                embeddings=list(embeddings),
-                documents=list(documents),
-                metadatas=list(metadatas),
+                ids=[ids[j] for j in new],
+                embeddings=embeddings[new],
+                documents=[documents[j] for j in new],
+                metadatas=[metadatas[j] for j in new],
+            )
+
+    @modal.method()
+    def finish(self, stale: list[str], updates: dict[str, str | None]) -> int:
+        """Record manifest updates, prune stale chunks, commit. Returns chunks deleted.
+
+        Called once after a run's upserts. updates maps every source whose
+        fingerprint changed to its new one, or None if removed. It's recorded
+        even when the new version produced no chunks, so the old version's
+        chunks never outlive it.
+
+        stale names the previously indexed sources that changed or were
+        removed; a chunk of theirs is stale when its fingerprint no longer
+        matches the manifest — text that no longer appears in the file.
+        """
+        self._refresh_indexed()
+        self._record_updates(updates)
+        deleted = self._prune(stale)
+        self._commit()
+        return deleted
+
+    def _prune(self, sources: list[str]) -> int:
+        stale_ids: list[str] = []
+        offset = 0
+        while sources:
+            page = self._collection.get(
+                where={"source": {"$in": sources}},
+                include=["metadatas"],
+                limit=self._batch_size,
+                offset=offset,
+            )
+            stale_ids.extend(
+                id_ for id_, meta in zip(page["ids"], page["metadatas"])
+                if meta.get("fingerprint") != self._indexed.get(meta.get("source"))
             )
-        return len(chunks)
+            if len(page["ids"]) < self._batch_size:
+                break
+            offset += self._batch_size
+        # Deleted only after paging, so the offsets above stay valid
+        for i in range(0, len(stale_ids), self._batch_size):
+            self._collection.delete(ids=stale_ids[i : i + self._batch_size])
+        print(f"  upsert-worker: pruned {len(stale_ids):,} stale chunks", flush=True)
+        return len(stale_ids)
 
     @modal.method()
     def get_indexed_files(self) -> dict[str, str]:
@@ -52,7 +155,57 @@ class UpsertWorker:
 
         Used by Scanner to compare disk fingerprints against what's
         already in ChromaDB, skipping files that haven't changed.
+        Served from the in-memory copy of the manifest, re-read only if
+        the file changed under it (mtime/size differ from our last write).
         """
+        self._refresh_indexed()
+        return self._indexed
+
+    def _refresh_indexed(self) -> None:
+        stamp = _stamp(MANIFEST_PATH)
+        if stamp != self._manifest_stamp:
+            self._indexed = self._load_manifest()
+            self._manifest_stamp = stamp
+
+    def _load_manifest(self) -> dict[str, str]:
+        import orjson
+
+        indexed: dict[str, str] = {}
+        for line in MANIFEST_PATH.read_bytes().splitlines():
+            if not line.strip():
+                continue
+            try:
+                indexed.update(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # Torn append from a crashed run — its source is simply re-indexed
+                continue
+        return {source: fp for source, fp in indexed.items() if fp is not None}
+
+    def _record_sources(self, metadatas: list[dict]) -> None:
+        """Append one manifest line per distinct (source, fingerprint) just upserted."""
+        import orjson
+
+        seen = {(m.get("source"), m.get("fingerprint")) for m in metadatas}
+        for source, fingerprint in seen:
+            if source and fingerprint:
+                self._manifest.write(orjson.dumps({source: fingerprint}) + b"\n")
+                self._indexed[source] = fingerprint
+        self._manifest_stamp = _stamp(MANIFEST_PATH)
+
+    def _record_updates(self, updates: dict[str, str | None]) -> None:
+        """Append a manifest line per update; a None fingerprint is a removal tombstone."""
+        import orjson
+
+        for source, fingerprint in updates.items():
+            self._manifest.write(orjson.dumps({source: fingerprint}) + b"\n")
+            if fingerprint is None:
+                self._indexed.pop(source, None)
+            else:
+                self._indexed[source] = fingerprint
+        self._manifest_stamp = _stamp(MANIFEST_PATH)
+
+    def _scan_collection(self) -> dict[str, str]:
+        """Page through all chunk metadata for {source: fingerprint}."""
         indexed: dict[str, str] = {}
         total = self._collection.count()
         page_size = 5_000
@@ -64,3 +217,12 @@ class UpsertWorker:
                 if source and fingerprint:
                     indexed[source] = fingerprint
         return indexed
+
+    def _commit(self) -> None:
+        rag_vol.commit()
+        self._uncommitted = 0
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
@@ -1,5 +1,7 @@
 """Orchestrates scan → parallel embed → upsert → summary."""
 
+import asyncio
+import contextlib
 from pathlib import Path
 
 from .pipeline.embed_worker import EmbedWorker, WORKERS_PER_GPU
@@ -10,6 +12,9 @@ from .pipeline.preprocess.scanner import Scanner
 # Number of GPU containers to fan out across
 N_WORKERS = 8
 
+# Embed results buffered ahead of the upsert worker
+UPSERT_QUEUE_SIZE = 2
+
 
 class IndexService:
     """Scans for new docs, embeds in parallel on GPU, upserts to ChromaDB."""
@@ -24,14 +29,56 @@ class IndexService:
         """Run the full indexing pipeline. Blocks until complete."""
 
         # Find new/changed files by comparing disk fingerprints to ChromaDB
-        files = self._scanner.scan()
+        files, stale, updates = self._scanner.scan()
 
         # Split files into per-worker batches (N_WORKERS × WORKERS_PER_GPU)
         batches = self._batch_builder.build(files)
 
         # Embed on GPU, upsert to ChromaDB as each embed finishes
-        embeddings = self._embed_worker.embed.starmap(batches, order_outputs=False)
-        
-        chunks = sum(self._upsert_worker.upsert.remote(r) for r in embeddings)
+        chunks = asyncio.run(self._embed_and_upsert(batches))
+
+        # Record refreshed and removed fingerprints, drop chunks left over from
+        # old versions of changed files and from deleted files, then commit
+        # the volume once for the whole run
+        self._upsert_worker.finish.remote(stale, updates)
 
         return f"Indexed {chunks:,} passages."
+
+    async def _embed_and_upsert(self, batches: list[tuple[dict, int]]) -> int:
+        """Stream embed results into a single upsert task; returns chunks written.
+
+        The next embed result downloads while the previous one is being
+        written, and progress is logged as each worker finishes. The first
+        upsert failure stops the embed fan-out and is raised.
+        """
+        pending: asyncio.Queue = asyncio.Queue(maxsize=UPSERT_QUEUE_SIZE)
+        upserter = asyncio.create_task(self._upsert_loop(pending))
+        try:
+            done = 0
+            # aclosing: leaving early cancels the embed inputs still outstanding
+            results = self._embed_worker.embed.starmap.aio(batches, order_outputs=False)
+            async with contextlib.aclosing(results):
+                async for result in results:
+                    done += 1
+                    print(f"[index] embedded {done}/{len(batches)} (worker-{result[1]}, {len(result[0]['ids']):,} chunks)", flush=True)
+                    await _put(pending, result, upserter)
+        finally:
+            if not upserter.done():
+                await pending.put(None)
+        return await upserter
+
+    async def _upsert_loop(self, pending: asyncio.Queue) -> int:
+        """Drain embed results into the single UpsertWorker until a None sentinel."""
+        total = 0
+        while (result := await pending.get()) is not None:
+            total += await self._upsert_worker.upsert.remote.aio(*result)
+        return total
+
+
+async def _put(queue: asyncio.Queue, item, consumer: asyncio.Task) -> None:
+    """Put item on queue, raising the consumer's error instead if it fails first."""
+    put = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+    if consumer.done():
+        put.cancel()
+        consumer.result()
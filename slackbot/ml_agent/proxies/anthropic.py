@@ -10,9 +10,14 @@ import modal
 
 from slackbot.modal_app import app
 
-proxy_image = modal.Image.debian_slim(python_version="3.12").pip_install("httpx", "fastapi")
+proxy_image = modal.Image.debian_slim(python_version="3.12").pip_install("httpx[http2]", "fastapi")
 proxy_secret = modal.Secret.from_name("anthropic-secret")
 
+# Not forwarded upstream: host plus connection-specific headers, which HTTP/2 rejects
+_SKIP_HEADERS = frozenset({"host", "connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade", "te"})
+# Upstream response headers the raw body depends on
+_RELAY_HEADERS = frozenset({"content-type", "content-encoding"})
+
 
 @app.function(image=proxy_image, secrets=[proxy_secret], min_containers=0)
 @modal.concurrent(max_inputs=100)
@@ -21,27 +26,32 @@ def anthropic_proxy():
     import httpx
     from fastapi import FastAPI, Request
     from fastapi.responses import StreamingResponse
+    from starlette.background import BackgroundTask
 
     proxy = FastAPI()
+    # One pooled client per container — reuses TLS connections to api.anthropic.com
+    client = httpx.AsyncClient(http2=True, timeout=300.0)
 
     # Catch-all route: {path:path} matches any path including slashes (e.g. "v1/messages")
     @proxy.api_route("/{path:path}", methods=["POST"])
     async def forward(request: Request, path: str):
-        body = await request.body()
-
-        # Drop headers that httpx sets automatically, swap in the real API key
-        skip = {"host", "content-length"}
-        headers = {k: v for k, v in request.headers.items() if k.lower() not in skip}
+        # Drop host (httpx sets it) and hop-by-hop headers, which HTTP/2 rejects;
+        # swap in the real API key. content-length is kept so the streamed body isn't sent chunked.
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in _SKIP_HEADERS}
         headers["x-api-key"] = os.environ["ANTHROPIC_API_KEY"]
         url = f"https://api.anthropic.com/{path}"
 
-        # Stream the response so the SDK gets SSE events in real time
-        async def pipe():
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                async with client.stream("POST", url, headers=headers, content=body) as resp:
-                    async for chunk in resp.aiter_bytes(): # Stream instead of buffer 
-                        yield chunk
-
-        return StreamingResponse(pipe(), media_type="text/event-stream")
+        # Send the streamed request body before the response starts, so nothing
+        # else reads from receive() while it's in flight
+        req = client.build_request("POST", url, headers=headers, content=request.stream())
+        resp = await client.send(req, stream=True)
+
+        # Relay the raw bytes so the SDK gets SSE events in real time
+        return StreamingResponse(
+            resp.aiter_raw(),
+            status_code=resp.status_code,
+            headers={k: v for k, v in resp.headers.items() if k.lower() in _RELAY_HEADERS},
+            background=BackgroundTask(resp.aclose),
+        )
 
     return proxy
@@ -10,6 +10,10 @@ from slackbot.modal_app import app, trackio_vol, TRACKIO_MOUNT
 syncer_image = modal.Image.debian_slim(python_version="3.12").pip_install("trackio")
 syncer_secret = modal.Secret.from_name("hf-secret")
 
+# Poll fast while metrics are flowing, back off to MAX_INTERVAL when idle
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+
 
 @app.function(
     image=syncer_image,
@@ -22,10 +26,13 @@ def trackio_syncer():
 
     mount = Path(TRACKIO_MOUNT)
     last_mtimes: dict[str, float] = {}
+    interval = MIN_INTERVAL
 
-    # Poll loop: check for new/changed .db files every 30s
+    # Poll loop: volume writes from the sandbox only appear after reload(),
+    # so file-watch events can't be used here
     while True:
         trackio_vol.reload()
+        changed = False
 
         # space_id is written by the sandbox when trackio.init() is called
         space_id = (mount / "space_id").read_text().strip() if (mount / "space_id").exists() else None
@@ -33,6 +40,7 @@ def trackio_syncer():
             for db in mount.glob("*.db"):
                 mtime = db.stat().st_mtime
                 if mtime > last_mtimes.get(db.name, 0):
+                    changed = True
                     # Sync changed db to the HF Space dashboard
                     try:
                         trackio.sync(project=db.stem, space_id=space_id, force=True)
@@ -40,4 +48,5 @@ def trackio_syncer():
                         print(f"[syncer] synced '{db.stem}'", flush=True)
                     except Exception as e:
                         print(f"[syncer] error '{db.stem}': {e}", flush=True)
-        time.sleep(30)
+        interval = MIN_INTERVAL if changed else min(interval * 2, MAX_INTERVAL)
+        time.sleep(interval)
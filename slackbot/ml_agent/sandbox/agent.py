@@ -6,10 +6,11 @@ across all turns — avoids the subprocess teardown/recreate that crashes.
 """
 
 import asyncio
-import json
 import os
 import sys
 import traceback
+
+import orjson
 from claude_agent_sdk import (
     AssistantMessage,
     ClaudeAgentOptions,
@@ -50,7 +51,7 @@ class Agent:
     async def receive_prompt(self) -> str:
         """Read the next JSON request from stdin and return the message."""
         line = await asyncio.to_thread(sys.stdin.readline)
-        return json.loads(line.strip())["message"]
+        return orjson.loads(line)["message"]
 
     async def send_response(self, message: str):
         """Forward a message to the Claude SDK and print responses to stdout."""
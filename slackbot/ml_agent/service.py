@@ -20,7 +20,7 @@ SANDBOX_NAME = "ml-agent"
 sandbox_image = (
     modal.Image.debian_slim(python_version="3.12")
     .apt_install("git", "curl")
-    .pip_install("claude-agent-sdk", "trackio")
+    .pip_install("claude-agent-sdk", "trackio", "orjson")
     .env({"IMAGE_VERSION": "1"})
     .add_local_dir(SANDBOX_DIR, "/agent")
     .add_local_dir(CLAUDE_DIR, "/app/.claude")
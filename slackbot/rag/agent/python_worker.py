@@ -0,0 +1,193 @@
+"""Long-lived Python interpreters for execute_python.
+
+Each worker is a `python` subprocess that pre-imports the analysis stack once
+and then runs one snippet per request, in a fresh globals dict. Requests are
+JSON lines on the worker's stdin; replies are JSON lines on its original
+stdout. The snippet's own fds 0/1/2 are swapped out per call, so prints,
+child processes, and input() can't touch the protocol.
+
+Run as a script, this module is the worker side.
+"""
+
+import json
+import os
+import queue
+import select
+import subprocess
+import sys
+from pathlib import Path
+
+TIMEOUT = 120
+# Snippets served per worker before it is replaced. Environment and new
+# modules are reset after each call, but in-place changes to pre-imported
+# modules (monkeypatching) can only be cleared by a fresh process
+WORKER_CALLS = 20
+
+# Idle workers, reused across calls; concurrent queries each take their own
+_idle: queue.SimpleQueue = queue.SimpleQueue()
+
+
+def run_python(code: str, cwd: Path) -> subprocess.CompletedProcess | None:
+    """Run code in an idle worker. Returns None if it timed out."""
+    try:
+        worker = _idle.get_nowait()
+    except queue.Empty:
+        worker = _Worker(cwd)
+    try:
+        result = worker.run(code)
+    except BaseException:
+        worker.close()
+        raise
+    if worker.alive() and worker.calls < WORKER_CALLS:
+        _idle.put(worker)
+    else:
+        worker.close()
+    return result
+
+
+class _Worker:
+
+    def __init__(self, cwd: Path):
+        self._proc = subprocess.Popen(
+            ["python", __file__, str(TIMEOUT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=str(cwd),
+            # Headless backend for the worker and anything the snippet spawns
+            env={**os.environ, "MPLBACKEND": "Agg"},
+        )
+        self.calls = 0
+
+    def run(self, code: str) -> subprocess.CompletedProcess | None:
+        self.calls += 1
+        self._proc.stdin.write(json.dumps({"code": code}).encode() + b"\n")
+        self._proc.stdin.flush()
+        # The worker's SIGALRM handles ordinary timeouts; this covers code stuck in C
+        ready, _, _ = select.select([self._proc.stdout], [], [], TIMEOUT + 5)
+        line = self._proc.stdout.readline() if ready else b""
+        if not line:
+            self.close()
+            return None if not ready else subprocess.CompletedProcess("python", self._proc.returncode, "", "")
+        reply = json.loads(line)
+        if reply["timed_out"]:
+            return None
+        return subprocess.CompletedProcess("python", reply["returncode"], reply["stdout"], reply["stderr"])
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def close(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+
+
+# ── Worker side ──────────────────────────────────────────────────────────────
+
+
+def _serve(timeout: int) -> None:
+    import signal
+    import sysconfig
+    import tempfile
+    import traceback
+
+    # Paid once per worker instead of once per call
+    for module in ("pandas", "matplotlib.pyplot", "openpyxl"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+
+    # Keep private handles on the protocol pipes, then point fd 0 at /dev/null
+    requests = os.fdopen(os.dup(0), "rb")
+    replies = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    cwd = os.getcwd()
+    # Started as a script, sys.path[0] is this package's directory — its
+    # tools/run/workflow modules would shadow user imports. Resolve from the
+    # cwd instead, as python -c does
+    sys.path[0] = ""
+
+    # Baseline state each snippet starts from, as under a fresh python -c
+    environ = dict(os.environ)
+    modules = set(sys.modules)
+    path = list(sys.path)
+    # Where installed packages live; anything imported from elsewhere is user code
+    install_dirs = tuple({sysconfig.get_path(name) for name in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+    def on_alarm(signum, frame):
+        raise _Timeout
+
+    signal.signal(signal.SIGALRM, on_alarm)
+
+    for line in requests:
+        code = json.loads(line)["code"]
+        os.chdir(cwd)
+        sys.argv = ["-c"]
+        returncode, timed_out = 0, False
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            saved = os.dup(1), os.dup(2)
+            os.dup2(out.fileno(), 1)
+            os.dup2(err.fileno(), 2)
+            signal.alarm(timeout)
+            try:
+                exec(compile(code, "<string>", "exec"), {"__name__": "__main__"})
+            except _Timeout:
+                timed_out = True
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    returncode = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except BaseException as e:
+                # Drop this frame so the traceback starts at the snippet, as with python -c
+                traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+                returncode = 1
+            finally:
+                signal.alarm(0)
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os.dup2(saved[0], 1)
+                os.dup2(saved[1], 2)
+                os.close(saved[0])
+                os.close(saved[1])
+            out.seek(0)
+            err.seek(0)
+            stdout = out.read().decode("utf-8", errors="replace")
+            stderr = err.read().decode("utf-8", errors="replace")
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+        _reset(environ, modules, path, install_dirs)
+        replies.write(json.dumps({
+            "returncode": returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "timed_out": timed_out,
+        }).encode() + b"\n")
+        replies.flush()
+
+
+class _Timeout(BaseException):
+    """Raised by SIGALRM. Not an Exception, so a snippet's own except clauses
+    can't swallow it, and distinct from any TimeoutError the snippet raises."""
+
+
+def _reset(environ: dict, modules: set, path: list, install_dirs: tuple) -> None:
+    """Undo a snippet's environment, sys.path and user-module changes."""
+    if os.environ != environ:
+        os.environ.clear()
+        os.environ.update(environ)
+    sys.path[:] = path
+    # Installed packages a snippet imported are kept warm; its own modules
+    # (e.g. helpers next to the cwd) are dropped so the next call re-imports them
+    for name in set(sys.modules) - modules:
+        origin = getattr(sys.modules[name], "__file__", None)
+        if origin and not origin.startswith(install_dirs):
+            del sys.modules[name]
+
+
+if __name__ == "__main__":
+    _serve(int(sys.argv[1]))
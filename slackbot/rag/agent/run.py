@@ -1,23 +1,43 @@
 """Query execution and response parsing helpers."""
 
+import os
 import re
 import shutil
 
 from ..config import OUTPUT_DIR
 from .tools import list_output_files
 
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
 
 async def run_query(message, *, llm, search_index):
     """Execute a RAG workflow and return the response."""
     from .workflow import create_workflow
 
-    shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
+    _clear_output_dir()
     workflow = create_workflow(search_index, llm)
     return await workflow.run(user_msg=message)
 
 
 def parse_response(response) -> tuple[str, list[str]]:
     """Strip think tags and collect output files."""
-    text = re.sub(r"<think>.*?</think>", "", str(response), flags=re.DOTALL).strip()
+    text = _THINK_RE.sub("", str(response)).strip()
     output_files = list_output_files()
     return text, output_files
+
+
+def _clear_output_dir() -> None:
+    """Empty OUTPUT_DIR in one scandir pass; outputs are almost always flat files."""
+    try:
+        with os.scandir(OUTPUT_DIR) as it:
+            entries = list(it)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
@@ -1,9 +1,12 @@
 """Stateless tool functions for the ReAct agent."""
 
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-from ..config import DOCS_DIR, OUTPUT_DIR, TOP_K
+from ..config import DEBUG_LLM, DOCS_DIR, OUTPUT_DIR, TOP_K
+from .python_worker import TIMEOUT, run_python
 
 
 def search_documents(query: str, search_index) -> str:
@@ -27,20 +30,16 @@ def execute_python(code: str) -> str:
     Input documents are at /data/rag/docs/.
     """
     code = code.replace("\\n", "\n").replace("\\t", "\t")
-    print(f"[EXECUTE_PYTHON] code:\n{code}", file=sys.stderr, flush=True)
+    if DEBUG_LLM:
+        print(f"[EXECUTE_PYTHON] code:\n{code}", file=sys.stderr, flush=True)
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    try:
-        result = subprocess.run(
-            ["python", "-c", code],
-            capture_output=True,
-            text=True,
-            timeout=120,
-            cwd=str(OUTPUT_DIR.parent),
-        )
-    except subprocess.TimeoutExpired:
-        return "[Error: Code execution timed out after 120 seconds]"
+    # Persistent interpreter with pandas/matplotlib already imported; fresh globals per call
+    result = run_python(code, cwd=OUTPUT_DIR.parent)
+    if result is None:
+        return f"[Error: Code execution timed out after {TIMEOUT} seconds]"
     output = _format_result(result)
-    print(f"[EXECUTE_PYTHON] output:\n{output}", file=sys.stderr, flush=True)
+    if DEBUG_LLM:
+        print(f"[EXECUTE_PYTHON] output:\n{output}", file=sys.stderr, flush=True)
     return output
 
 
@@ -52,7 +51,7 @@ def list_documents() -> str:
     """
     if not DOCS_DIR.exists():
         return "No documents directory found at /data/rag/docs/"
-    paths = [str(f) for f in sorted(DOCS_DIR.rglob("*")) if f.is_file()]
+    paths = sorted(_walk_files(str(DOCS_DIR)))
     return "\n".join(paths) if paths else "No files found in /data/rag/docs/"
 
 
@@ -60,11 +59,39 @@ def list_output_files() -> list[str]:
     """Return paths of files in the output directory."""
     if not OUTPUT_DIR.exists():
         return []
-    return [str(p) for p in sorted(OUTPUT_DIR.iterdir()) if p.is_file()]
+    with os.scandir(OUTPUT_DIR) as it:
+        return sorted(e.path for e in it if e.is_file())
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+def _walk_files(root: str) -> list[str]:
+    """Recursively list file paths under root, one directory per task.
+
+    DirEntry types come from the directory read itself, so no per-file stat
+    round-trips to the volume; subdirectories are listed concurrently.
+    """
+    files: list[str] = []
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pending = [pool.submit(_scan_dir, root)]
+        while pending:
+            dir_files, subdirs = pending.pop().result()
+            files.extend(dir_files)
+            pending.extend(pool.submit(_scan_dir, d) for d in subdirs)
+    return files
+
+
+def _scan_dir(path: str) -> tuple[list[str], list[str]]:
+    files, subdirs = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                files.append(entry.path)
+    return files, subdirs
+
+
 def _format_result(result: subprocess.CompletedProcess) -> str:
     parts = []
     if result.stdout:
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from llama_index.core.agent.workflow import AgentWorkflow, ReActAgent
 from llama_index.core.tools import FunctionTool
 
-from ..config import SYSTEM_PROMPT
+from ..config import DEBUG_LLM, SYSTEM_PROMPT
 from ..llm import LLM
 from .tools import execute_python, list_documents, search_documents
 
@@ -44,6 +44,6 @@ def create_workflow(search_index: SearchIndex, llm: LLM) -> AgentWorkflow:
         llm=llm.model,
         system_prompt=SYSTEM_PROMPT,
         max_iterations=10,
-        verbose=True,
+        verbose=DEBUG_LLM,
     )
     return AgentWorkflow(agents=[agent])
@@ -1,5 +1,6 @@
 """RAG pipeline configuration constants."""
 
+import os
 from pathlib import Path
 
 # --- Paths (all on /data volume, under /data/rag/ to avoid conflicts with ml_agent) ---
@@ -14,6 +15,12 @@ LLM_CONTEXT_WINDOW = 16384
 
 # --- Embeddings ---
 EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"  # 110M params, 768-dim
+# Baked into the image at build time; passed to the embedder so it loads from there
+EMBEDDING_CACHE_DIR = "/models"
+
+# --- Logging ---
+# Full ReAct traces and tool code/output dumps; off by default to keep per-step logging off the hot path
+DEBUG_LLM = bool(os.environ.get("DEBUG_LLM"))
 
 # --- Retrieval ---
 TOP_K = 3
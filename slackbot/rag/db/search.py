@@ -1,11 +1,13 @@
 """Read-only vector index for query-time search."""
 
 import chromadb
+import torch
+from chromadb.config import Settings
 from llama_index.core import StorageContext, VectorStoreIndex
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
-from ..config import CHROMA_COLLECTION, CHROMA_DIR, EMBEDDING_MODEL
+from ..config import CHROMA_COLLECTION, CHROMA_DIR, EMBEDDING_CACHE_DIR, EMBEDDING_MODEL
 
 
 class SearchIndex:
@@ -17,17 +19,26 @@ class SearchIndex:
     def __init__(self):
         self.embed_model = HuggingFaceEmbedding(
             model_name=EMBEDDING_MODEL,
+            cache_folder=EMBEDDING_CACHE_DIR,
             device="cuda",
             normalize=True,
             embed_batch_size=256,
+            # Same precision as the TEI sidecar that embedded the corpus
+            model_kwargs={"torch_dtype": torch.float16},
         )
+        # First encode pays for CUDA context and kernel loads — do it before the snapshot
+        self.embed_model.get_text_embedding("warmup")
         self._load_collection()
 
     def _load_collection(self):
         """Open ChromaDB and build the LlamaIndex vector store."""
         CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-        client = chromadb.PersistentClient(path=str(CHROMA_DIR))
+        client = chromadb.PersistentClient(
+            path=str(CHROMA_DIR),
+            settings=Settings(anonymized_telemetry=False),
+        )
         self._collection = client.get_or_create_collection(CHROMA_COLLECTION)
+        self._has_index = False
         vector_store = ChromaVectorStore(chroma_collection=self._collection)
         storage_context = StorageContext.from_defaults(vector_store=vector_store)
         self.index = VectorStoreIndex.from_vector_store(
@@ -41,5 +52,11 @@ class SearchIndex:
         self._load_collection()
 
     def has_index(self) -> bool:
-        """Check if any documents have been indexed."""
-        return self._collection.count() > 0
+        """Check if any documents have been indexed.
+
+        This class never deletes, so a non-empty collection stays non-empty
+        until reload() — only the empty case is re-counted.
+        """
+        if not self._has_index:
+            self._has_index = self._collection.count() > 0
+        return self._has_index
@@ -1,11 +1,12 @@
 """vLLM subprocess — start, warmup, sleep/wake for GPU snapshots."""
 
-import socket
+import http.client
 import subprocess
 import sys
 import threading
 import time
 
+import httpx
 import requests
 from llama_index.llms.openai_like import OpenAILike
 
@@ -43,6 +44,10 @@ class LLM:
             top_p=0.8,
             is_chat_model=True,
             context_window=LLM_CONTEXT_WINDOW,
+            # One pool shared by every agent step and concurrent query; vLLM serves HTTP/1.1 only
+            async_http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            ),
         )
 
     def start(self):
@@ -75,15 +80,21 @@ class LLM:
             "--quantization", "awq_marlin",
             "--gpu-memory-utilization", "0.90",
             "--max-model-len", str(LLM_CONTEXT_WINDOW),
-            "--enforce-eager",
             "--enable-sleep-mode",
             "--max-num-seqs", "4",
+            # ReAct steps resend the system prompt + prior context — reuse its KV blocks
+            "--enable-prefix-caching",
+            # Long RAG prompts prefill in slices alongside decode steps
+            "--enable-chunked-prefill",
+            "--max-num-batched-tokens", "8192",
         ]
         print("[LLM] Starting vLLM...", file=sys.stderr, flush=True)
         self._proc = subprocess.Popen(cmd, stdout=sys.stderr, stderr=subprocess.PIPE, text=True)
         threading.Thread(target=self._filter_stderr, daemon=True).start()
         self._wait_ready()
         print("[LLM] Server ready.", file=sys.stderr, flush=True)
+        # Confirms the served model (and its max_model_len) came up with the flags above
+        print(f"[LLM] Models: {requests.get(f'{_BASE_URL}/models', timeout=10).json()}", file=sys.stderr, flush=True)
 
     def _warmup(self):
         """Run 3 short inferences to warm up GPU kernels."""
@@ -96,16 +107,26 @@ class LLM:
         requests.post(f"http://localhost:{_PORT}/sleep?level=1").raise_for_status()
         print("[LLM] Sleeping (weights offloaded).", file=sys.stderr, flush=True)
 
-    def _wait_ready(self, timeout: int = 300, interval: float = 2.0):
+    def _wait_ready(self, timeout: int = 300, interval: float = 0.25):
+        """Poll GET /health over one keep-alive connection until it returns 200."""
         deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            try:
-                socket.create_connection(("localhost", _PORT), timeout=1).close()
-                return
-            except OSError:
+        conn = http.client.HTTPConnection("localhost", _PORT, timeout=1)
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    conn.request("GET", "/health")
+                    resp = conn.getresponse()
+                    resp.read()
+                    if resp.status == 200:
+                        return
+                except (OSError, http.client.HTTPException):
+                    # Reconnect on the next attempt
+                    conn.close()
                 if self._proc is not None and self._proc.poll() is not None:
                     raise RuntimeError(f"vLLM exited with code {self._proc.returncode}")
                 time.sleep(interval)
+        finally:
+            conn.close()
         raise RuntimeError(f"vLLM did not start within {timeout}s")
 
     def _filter_stderr(self):
@@ -7,6 +7,7 @@ subsequent cold starts restore from GPU snapshot (~1s).
 import modal
 
 from slackbot.modal_app import app, rag_vol
+from slackbot.rag.config import EMBEDDING_CACHE_DIR, EMBEDDING_MODEL
 
 # -- GPU image: CUDA + vLLM + LlamaIndex + doc parsing libs --
 
@@ -28,9 +29,18 @@ image = (
         "openpyxl",
         "matplotlib",
     )
+    # Bake the query embedder into the image; vLLM weights stay on the volume (--download-dir).
+    # Only the safetensors weights, configs and tokenizer — not the ONNX/.bin duplicates
+    .run_commands(
+        "python -c \"from huggingface_hub import snapshot_download; "
+        f"snapshot_download('{EMBEDDING_MODEL}', cache_dir='{EMBEDDING_CACHE_DIR}', "
+        "allow_patterns=['*.json', '*.safetensors', 'vocab.txt'], ignore_patterns=['onnx/*'])\""
+    )
     .env({
         "IMAGE_VERSION": "95",
         "TORCHINDUCTOR_COMPILE_THREADS": "1",
+        # torch.compile artifacts persist on the volume, so only the first boot compiles
+        "VLLM_CACHE_ROOT": "/data/vllm-cache",
         # Dev mode enables /sleep and /wake_up endpoints for GPU snapshots
         "VLLM_SERVER_DEV_MODE": "1",
         # Suppress NCCL heartbeat noise after snapshot restore
@@ -68,13 +78,27 @@ class RagService:
 
     @modal.enter(snap=False)
     def wake_up(self):
-        """After snapshot restore: reconnect ChromaDB (stale from snapshot), wake GPU."""
+        """After snapshot restore: reconnect ChromaDB (stale from snapshot), wake GPU.
+
+        Also starts the event loop all queries share, so the LLM client keeps
+        its connection pool between queries. Threads don't survive the
+        snapshot, so it's created here rather than in load().
+        """
+        import asyncio
+        import threading
+
         self._search_index.reload()
         self._llm.wake_up()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
 
     @modal.exit()
     def stop(self):
         self._llm.terminate()
+        # Absent if wake_up() failed before creating it
+        loop = getattr(self, "_loop", None)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
 
     # -- Interface --
 
@@ -84,5 +108,6 @@ class RagService:
         import asyncio
         from slackbot.rag.agent import parse_response, run_query
 
-        response = asyncio.run(run_query(message, llm=self._llm, search_index=self._search_index))
+        coro = run_query(message, llm=self._llm, search_index=self._search_index)
+        response = asyncio.run_coroutine_threadsafe(coro, self._loop).result()
         return parse_response(response)
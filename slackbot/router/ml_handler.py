@@ -1,6 +1,5 @@
 """Handle hf: messages — run prompt in the ML sandbox."""
 
-import json
 import threading
 
 END_SENTINEL = "__END__"
@@ -17,12 +16,14 @@ class MlHandler:
 
     def handle(self, prompt: str, thread_ts: str, say) -> None:
         """Send a prompt to the GPU sandbox and relay the response back to Slack."""
+        import orjson
+
         session = f"agent-{thread_ts}".replace(".", "-")
-        request = json.dumps({"message": prompt, "session": session})
+        request = orjson.dumps({"message": prompt, "session": session}) + b"\n"
 
         with self._lock:
             self._ensure_sandbox()
-            self._sandbox.stdin.write(request + "\n")
+            self._sandbox.stdin.write(request)
             self._sandbox.stdin.drain()
 
             lines = []
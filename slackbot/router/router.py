@@ -1,11 +1,16 @@
 """Router — parse @mention events and dispatch to the correct handler."""
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 from .index_handler import IndexHandler
 from .ml_handler import MlHandler
 from .rag_handler import RagHandler
 
+_MENTION_RE = re.compile(r"<@[A-Z0-9]+>")
+# Longest command name before the colon
+_MAX_COMMAND_LEN = 8
+
 
 class Router:
     """Parse Slack @mention events and dispatch to the correct handler."""
@@ -14,6 +19,12 @@ class Router:
         self._index = IndexHandler(indexer, vol)
         self._ml = MlHandler(ml_sb_fn)
         self._rag = RagHandler(rag, vol)
+        # MlHandler runs one turn at a time; queued hf: turns wait on this
+        # thread instead of tying up the shared dispatch pool
+        self._ml_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml")
+        # "prefix:" commands, looked up by the lowercased head of the message,
+        # with the executor each one runs on
+        self._commands = {"hf": (self._ml.handle, self._ml_queue)}
 
     def handle(self, event: dict, client) -> None:
         channel = event["channel"]
@@ -21,16 +32,24 @@ class Router:
         say = lambda text: client.chat_postMessage(channel=channel, text=text, thread_ts=thread_ts)
 
         # Strip the @mention tag to get the raw message
-        message = re.sub(r"<@[A-Z0-9]+>", "", event.get("text", "")).strip()
-
+        message = _MENTION_RE.sub("", event.get("text", "")).strip()
+
+        if event.get("files"):
+            self._run(say, self._index.handle, event["files"], say)
+            return
+        # Only the short head before the colon is searched and lowercased, never the whole prompt
+        colon = message.find(":", 0, _MAX_COMMAND_LEN + 1)
+        command = self._commands.get(message[:colon].lower()) if colon > 0 else None
+        if command is not None:
+            handler, executor = command
+            executor.submit(self._run, say, handler, message[colon + 1:].strip(), thread_ts, say)
+        else:
+            self._run(say, self._rag.handle, message, thread_ts, channel, say, client)
+
+    def _run(self, say, handler, *args) -> None:
+        """Call a handler, reporting any error back to the Slack thread."""
         try:
-            if event.get("files"):
-                self._index.handle(event["files"], say)
-            elif message.lower().startswith("hf:"):
-                self._ml.handle(message[3:].strip(), thread_ts, say)
-            else:
-                self._rag.handle(message, thread_ts, channel, say, client)
-
+            handler(*args)
         except Exception as e:
             print(f"[router] error: {e}", flush=True)
             say(f":x: Error: {e}")